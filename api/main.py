@@ -3,7 +3,11 @@ from pydantic import BaseModel
 import joblib
 import numpy as np
 import os
+import time
 import traceback
+from micro_batcher import MicroBatcher
+from request_logger import get_request_logger, log_request
+from season_simulator import DEFAULT_SIMS, simulate_season
 
 app = FastAPI()
 
@@ -16,25 +20,49 @@ def root():
 model_path = "models/match_outcome_model.pkl"
 model = joblib.load(model_path) if os.path.exists(model_path) else None
 
+# ✅ Batch concurrent single-row requests into one predict_proba call
+batcher = MicroBatcher(
+    model.predict_proba,
+    max_batch_size=int(os.getenv("PREDICT_MAX_BATCH", 64)),
+    max_wait_ms=float(os.getenv("PREDICT_MAX_WAIT_MS", 2)),
+) if model is not None else None
+
+# A few batching windows plus the time one predict_proba call may take
+predict_timeout = (4 * batcher.max_wait if batcher else 0) + float(os.getenv("PREDICT_MODEL_TIMEOUT_S", 1))
+
 # ✅ Define input structure
 class OddsInput(BaseModel):
     odds_home: float
     odds_draw: float
     odds_away: float
 
+# ✅ Batching and request-log metrics
+@app.get("/metrics")
+def metrics():
+    return {
+        "batching": batcher.metrics() if batcher is not None else {"error": "Model not loaded"},
+        "request_log": get_request_logger("api").stats(),
+    }
+
 # ✅ Prediction route
 @app.post("/predict")
 def predict_odds(data: OddsInput):
+    start = time.perf_counter()
+    response = _predict_odds(data)
+    log_request("api", "/predict", data.dict(), response, (time.perf_counter() - start) * 1000)
+    return response
+
+def _predict_odds(data: OddsInput):
     try:
         if model is None:
             print("❌ Model not loaded")
             return {"error": "Model not loaded"}
 
         print("📥 Received odds:", data.dict())
-        X = np.array([[data.odds_home, data.odds_draw, data.odds_away]])
+        X = np.array([data.odds_home, data.odds_draw, data.odds_away])
         print("✅ Input array:", X)
 
-        prediction = model.predict_proba(X)[0]
+        prediction = batcher.predict(X, timeout=predict_timeout)
         print("✅ Prediction result:", prediction)
 
         return {
@@ -47,3 +75,20 @@ def predict_odds(data: OddsInput):
         print("❌ Internal Server Error:")
         traceback.print_exc()
         return {"error": "Internal server error", "details": str(e)}
+
+# ✅ Season simulation route
+# Only a few simulation counts are offered so results stay cacheable and one request can't tie up the CPU
+SIM_CHOICES = (10_000, 50_000, DEFAULT_SIMS)
+
+@app.get("/simulate/{league}")
+def simulate(league: str, season: int = None, sims: int = DEFAULT_SIMS):
+    if sims not in SIM_CHOICES:
+        return {"error": f"sims must be one of {', '.join(map(str, SIM_CHOICES))}"}
+    try:
+        return simulate_season(league, season, sims, int(os.getenv("SIM_WORKERS", 1)))
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        print("❌ Simulation error:")
+        traceback.print_exc()
+        return {"error": "Internal server error", "details": str(e)}
@@ -0,0 +1,104 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+METRICS_WINDOW = 2000  # recent batches kept for delay percentiles
+
+
+class MicroBatcher:
+    """Collects single-row predictions from concurrent callers into one matrix.
+
+    A worker thread waits for the first queued row, keeps collecting until
+    `max_batch_size` rows are queued or `max_wait_ms` has passed, then runs one
+    `predict_fn` call on the stacked rows and hands each caller its own row of
+    the result.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._max_seen = 0
+        self._sizes = collections.Counter()
+        self._delays = collections.deque(maxlen=METRICS_WINDOW)
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Queue one feature row and return a Future resolving to its prediction."""
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=float), future, time.perf_counter()))
+        return future
+
+    def predict(self, row, timeout=None):
+        """Blocking form of `submit`; raises TimeoutError if no result arrives in time."""
+        return self.submit(row).result(timeout=timeout)
+
+    def metrics(self):
+        with self._lock:
+            delays = np.array(self._delays) if self._delays else None
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._max_seen,
+                "batch_size_counts": dict(sorted(self._sizes.items())),
+                "queue_delay_ms": {
+                    "p50": round(float(np.percentile(delays, 50)), 3),
+                    "p95": round(float(np.percentile(delays, 95)), 3),
+                    "p99": round(float(np.percentile(delays, 99)), 3),
+                    "max": round(float(delays.max()), 3),
+                } if delays is not None else {},
+            }
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # Never let the worker die with callers still waiting on this batch
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch):
+        rows, futures, enqueued = zip(*batch)
+        started = time.perf_counter()
+        try:
+            results = self.predict_fn(np.vstack(rows))
+            if len(results) != len(futures):
+                raise ValueError(f"predict_fn returned {len(results)} rows for a batch of {len(futures)}")
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._max_seen = max(self._max_seen, len(batch))
+            self._sizes[len(batch)] += 1
+            self._delays.extend((started - t) * 1000 for t in enqueued)
@@ -1,9 +1,13 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 from predict_engine import predict_match, get_all_teams, get_upcoming_matches
+from request_logger import log_request
+from season_simulator import simulate_season, TOP_N
 
 load_dotenv()
 print("DEBUG - DISCORD_BOT_TOKEN:", os.getenv("DISCORD_BOT_TOKEN"))
@@ -31,7 +35,13 @@ async def on_ready():
 async def predict(interaction: discord.Interaction, match: str):
     await interaction.response.defer()
     try:
+        start = time.perf_counter()
         predictions = predict_match(match)
+        logged = {
+            "1X2": [float(p) for p in predictions["1X2"]],
+            "BTTS": bool(predictions["BTTS"])
+        } if predictions is not None else None
+        log_request("bot", "predict", {"match": match}, logged, (time.perf_counter() - start) * 1000)
         if predictions is None:
             await interaction.followup.send("❌ Could not make a prediction for this match.")
             return
@@ -73,6 +83,30 @@ async def upcoming(interaction: discord.Interaction):
     except Exception as e:
         await interaction.response.send_message(f"⚠️ Error fetching upcoming matches: {e}")
 
+@tree.command(name="simulate", description="🏆 Simulate the rest of the season: title, top 4 and relegation odds", guild=discord.Object(id=GUILD_ID))
+@app_commands.describe(league="Division code, e.g. E0, SP1, I1, D1, F1")
+async def simulate(interaction: discord.Interaction, league: str):
+    await interaction.response.defer()
+    try:
+        # Run off the event loop so the bot stays responsive while simulating
+        try:
+            result = await asyncio.to_thread(simulate_season, league)
+        except ValueError as e:
+            await interaction.followup.send(f"❌ {e}")
+            return
+
+        result_lines = [f"🏆 **Simulación {result['league']} {result['season']}** ({result['simulations']:,} temporadas)"]
+        result_lines.append("`Equipo               Pts  xPts  Título  Top4  Descenso`")
+        for s in result["standings"]:
+            result_lines.append(
+                f"`{s['team'][:20]:<20} {s['points']:>3} {s['expected_points']:>5.1f} {s['title']:>6.1f}% "
+                f"{s[f'top_{TOP_N}']:>4.0f}% {s['relegation']:>6.1f}%`"
+            )
+
+        await interaction.followup.send("\n".join(result_lines))
+    except Exception as e:
+        await interaction.followup.send(f"⚠️ Error running simulation: {e}")
+
 print(f"TOKEN is: {TOKEN}")
 
 bot.run(TOKEN)
\ No newline at end of file
@@ -0,0 +1,121 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def _snapshot_lines(path):
+    """Lines of a plain log as it was when replay started.
+
+    The server being replayed against may be appending to this very file, so
+    reading stops at the size it had on open instead of following new records.
+    """
+    end = os.path.getsize(path)
+    with open(path, "rb") as f:
+        while f.tell() < end:
+            line = f.readline()
+            if f.tell() > end:
+                break  # record still being written when the snapshot was taken
+            yield line.decode("utf-8", errors="replace")
+
+
+def read_records(path, source="api"):
+    """Stream logged requests from a JSONL file (plain or .gz) written by request_logger."""
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            yield from _parse(f, source)
+    else:
+        yield from _parse(_snapshot_lines(path), source)
+
+
+def _parse(lines, source):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("source") == source and record.get("endpoint") and record.get("request") is not None:
+            yield record
+
+
+def replay(path, base_url, concurrency, rate, limit=None):
+    """Send every recorded request to base_url and return (latencies_ms, errors, elapsed_s)."""
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def send(record, scheduled):
+        nonlocal errors
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        # With a target rate, time from when the request was due so queueing behind a slow server counts
+        start = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            r = local.session.post(base_url + record["endpoint"], json=record["request"], timeout=30)
+            ok = r.status_code == 200 and "error" not in r.json()
+        except Exception:
+            ok = False
+        latency = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(latency)
+            if not ok:
+                errors += 1
+
+    interval = 1.0 / rate if rate else 0.0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Bound the number of in-flight submissions so huge files are streamed, not buffered
+        slots = threading.Semaphore(concurrency * 4)
+
+        def done(_):
+            slots.release()
+
+        for i, record in enumerate(read_records(path)):
+            if limit is not None and i >= limit:
+                break
+            scheduled = None
+            if interval:
+                scheduled = started + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            slots.acquire()
+            pool.submit(send, record, scheduled).add_done_callback(done)
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded request log against a local API instance")
+    parser.add_argument("log", help="JSONL request log, e.g. logs/requests-api.jsonl (optionally .gz)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the API")
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of requests in flight")
+    parser.add_argument("--rate", type=float, default=0, help="Requests per second (0 = as fast as possible)")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many requests")
+    args = parser.parse_args()
+
+    print(f"🔁 Replaying {args.log} against {args.url} (concurrency={args.concurrency}, rate={args.rate or 'max'})")
+    latencies, errors, elapsed = replay(args.log, args.url.rstrip("/"), args.concurrency, args.rate, args.limit)
+
+    if not latencies:
+        print("❌ No replayable requests found")
+        return
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"✅ Requests: {len(latencies)}  Errors: {errors}  Elapsed: {elapsed:.2f}s")
+    print(f"📊 Throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"⏱️ Latency ms  p50: {p50:.2f}  p95: {p95:.2f}  p99: {p99:.2f}  max: {max(latencies):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+LOG_DIR = "logs"
+MAX_BYTES = 50 * 1024 * 1024
+COMPRESS = True
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5  # seconds
+QUEUE_SIZE = 10000
+
+
+class RequestLogger:
+    """Append-only JSONL writer that batches records on a background thread.
+
+    `log()` never touches the disk: it only puts the record (by reference, so
+    callers must not mutate it afterwards) on a bounded queue. Records that
+    arrive while the queue is full are dropped and counted; see `stats()`.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, compress=COMPRESS,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._dropped = 0
+        self._dropped_reported = 0
+        self._rotations = 0
+        self._count_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-logger", daemon=True)
+        self._thread.start()
+
+    def log(self, record):
+        """Queue a record for writing. Drops it if the writer has fallen behind."""
+        record.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._count_lock:
+                self._dropped += 1
+
+    def stats(self):
+        with self._count_lock:
+            dropped = self._dropped
+        return {"path": self.path, "queued": self._queue.qsize(), "dropped": dropped}
+
+    def close(self):
+        """Stop the writer thread after flushing everything already queued."""
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._drain()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    print(f"❌ Request log write failed: {e}")
+            self._report_dropped()
+
+    def _report_dropped(self):
+        with self._count_lock:
+            dropped = self._dropped
+        if dropped > self._dropped_reported:
+            print(f"⚠️ Request log queue full: dropped {dropped - self._dropped_reported} records "
+                  f"({dropped} total)")
+            self._dropped_reported = dropped
+
+    def _drain(self):
+        # Block for the first record, then take whatever else is already queued
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lines = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            size = f.tell()
+        if self.max_bytes and size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+        base, ext = os.path.splitext(self.path)
+        # Several rotations can land in the same millisecond when max_bytes is small,
+        # so add a counter and skip any name that is already taken
+        while True:
+            self._rotations += 1
+            rotated = f"{base}-{stamp}-{self._rotations}{ext}"
+            if not os.path.exists(rotated) and not os.path.exists(rotated + ".gz"):
+                break
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+
+_loggers = {}
+_logger_lock = threading.Lock()
+
+
+def get_request_logger(source):
+    """Return the logger for one source ("api", "bot"), starting it on first use.
+
+    Each source writes its own logs/requests-{source}.jsonl so that the API and
+    the bot, which run as separate processes, never append to or rotate the
+    same file.
+    """
+    with _logger_lock:
+        if source not in _loggers:
+            # Read the environment here rather than at import so .env values loaded later still apply
+            logger = RequestLogger(
+                path=os.path.join(os.getenv("REQUEST_LOG_DIR", LOG_DIR), f"requests-{source}.jsonl"),
+                max_bytes=int(os.getenv("REQUEST_LOG_MAX_BYTES", MAX_BYTES)),
+                compress=os.getenv("REQUEST_LOG_COMPRESS", "1" if COMPRESS else "0") == "1",
+            )
+            atexit.register(logger.close)
+            _loggers[source] = logger
+        return _loggers[source]
+
+
+def log_request(source, endpoint, request, response, latency_ms):
+    get_request_logger(source).log({
+        "ts": time.time(),
+        "source": source,
+        "endpoint": endpoint,
+        "request": request,
+        "response": response,
+        "latency_ms": round(latency_ms, 3),
+    })
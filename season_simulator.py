@@ -0,0 +1,465 @@
+import argparse
+import collections
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DATA_PATH = "historical_matches_fully_enhanced.csv"
+MODEL_PATH = "model.pkl"
+BTTS_MODEL_PATH = "model_btts.pkl"
+FIXTURES_DIR = "data/fixtures"  # optional {league}_{season}.csv schedules with home_team, away_team columns
+DEFAULT_SIMS = 100_000
+MAX_SIMS = 1_000_000
+CHUNK_SIZE = 10_000  # simulations per array pass; bounds memory and is the unit of work per process
+CACHE_SIZE = 32
+TOP_N = 4
+
+# Number of clubs and direct relegation places per division
+LEAGUE_FORMATS = {
+    "E0": (20, 3),
+    "E1": (24, 3),
+    "SP1": (20, 3),
+    "I1": (20, 3),
+    "D1": (18, 2),
+    "F1": (18, 2),
+}
+
+FEATURE_COLUMNS = [
+    "elo_diff", "form_diff", "goal_diff", "rank_diff",
+    "momentum_diff", "home_away_split_diff", "h2h_home_wins_last3",
+    "h2h_away_wins_last3", "h2h_goal_diff_last3", "draw_rate_last5",
+    "avg_goal_diff_last5", "days_since_last_match", "fixture_density_flag",
+    "odds_diff", "implied_prob_home"
+]
+
+# train_model.py encodes result -1/0/1 (away/draw/home) as classes 0/1/2
+AWAY, DRAW, HOME = 0, 1, 2
+
+_models = {}
+_cache = collections.OrderedDict()
+_lock = threading.Lock()
+_pool = None
+_pool_workers = 0
+
+
+def league_format(league, season):
+    """(clubs, directly relegated clubs) for a division in a given season."""
+    if league == "F1" and season < 2023:
+        # Ligue 1 had 20 clubs until 2022-23, which relegated four to shrink the league
+        return (20, 4) if season == 2022 else (20, 2)
+    if league not in LEAGUE_FORMATS:
+        raise ValueError(f"Unknown league {league}; expected one of {', '.join(LEAGUE_FORMATS)}")
+    return LEAGUE_FORMATS[league]
+
+
+def assign_seasons(df):
+    """Season start year for every match.
+
+    A season starts after a summer break of more than 30 days, so the 2019-20
+    matches played in July/August 2020 stay in their own season.
+    """
+    seasons = pd.Series(0, index=df.index)
+    for _, dates in df.groupby("div")["date"]:
+        dates = dates.sort_values()
+        gap = dates.diff().dt.days
+        starts = (gap.isna() | ((gap > 30) & dates.dt.month.between(7, 10))).to_numpy()
+        first = dates[starts]
+        labels = np.where(first.dt.month >= 7, first.dt.year, first.dt.year - 1)
+        seasons[dates.index] = labels[np.cumsum(starts) - 1]
+    return seasons
+
+
+MATCH_COLUMNS = [
+    "div", "date", "home_team", "away_team", "fthg", "ftag", "result",
+    "home_elo", "home_rank", "away_elo", "away_rank"
+]
+
+
+def load_matches(path=DATA_PATH):
+    df = pd.read_csv(path, usecols=MATCH_COLUMNS)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date", "fthg", "ftag"])
+    df = df.assign(season=assign_seasons(df))
+    return df.sort_values("date")
+
+
+def load_models():
+    """Load the 1X2 and BTTS models, reloading them whenever model.pkl changes on disk."""
+    version = model_version()
+    with _lock:
+        if _models.get("version") != version:
+            _models.update(version=version, main=joblib.load(MODEL_PATH), btts=joblib.load(BTTS_MODEL_PATH))
+        return _models["main"], _models["btts"]
+
+
+def model_version():
+    stat = os.stat(MODEL_PATH)
+    return f"{int(stat.st_mtime)}-{stat.st_size}"
+
+
+def current_standings(season_df, teams):
+    """Points, goal difference and goals scored so far for every team in the season."""
+    home = season_df.groupby("home_team").agg(gf=("fthg", "sum"), ga=("ftag", "sum"),
+                                              w=("result", lambda r: (r == 1).sum()),
+                                              d=("result", lambda r: (r == 0).sum()),
+                                              p=("result", "size"))
+    away = season_df.groupby("away_team").agg(gf=("ftag", "sum"), ga=("fthg", "sum"),
+                                              w=("result", lambda r: (r == -1).sum()),
+                                              d=("result", lambda r: (r == 0).sum()),
+                                              p=("result", "size"))
+    table = home.add(away, fill_value=0).reindex(teams, fill_value=0)
+    table["points"] = 3 * table["w"] + table["d"]
+    table["gd"] = table["gf"] - table["ga"]
+    return table.astype(int)
+
+
+def load_fixtures(league, season):
+    """Remaining fixtures from data/fixtures/{league}_{season}.csv, or None if there is no such file."""
+    path = os.path.join(FIXTURES_DIR, f"{league}_{season}.csv")
+    if not os.path.exists(path):
+        return None
+    return read_fixtures(path)
+
+
+def read_fixtures(path):
+    schedule = pd.read_csv(path)
+    return list(zip(schedule["home_team"].str.strip(), schedule["away_team"].str.strip()))
+
+
+def remaining_fixtures(season_df, teams):
+    """Every home/away pairing of a double round-robin that has not been played yet."""
+    played = set(zip(season_df["home_team"], season_df["away_team"]))
+    return [(h, a) for h in teams for a in teams if h != a and (h, a) not in played]
+
+
+def validate_schedule(season_df, teams, fixtures, league_size, label):
+    """Raise ValueError unless played plus remaining matches form one full double round-robin."""
+    if len(teams) != league_size:
+        raise ValueError(f"{label} has {len(teams)} teams in the data but the league has {league_size}; "
+                         f"the dataset is incomplete for this season")
+    played = list(zip(season_df["home_team"], season_df["away_team"]))
+    pairs = collections.Counter(played + list(fixtures))
+    repeated = [f"{h} vs {a}" for (h, a), n in pairs.items() if n > 1 or h == a]
+    if repeated:
+        raise ValueError(f"{label} lists these fixtures more than once: {', '.join(repeated[:5])}")
+    per_team = collections.Counter([h for h, _ in pairs] + [a for _, a in pairs])
+    expected = 2 * (league_size - 1)
+    short = [f"{t} ({per_team[t]})" for t in teams if per_team[t] != expected]
+    if short:
+        raise ValueError(f"{label}: every team needs {expected} fixtures, but these do not have that many: "
+                         f"{', '.join(short[:5])}")
+
+
+def _last5(matches, venue):
+    """Last-5 form for one side, computed the same way as add_recent_form.py."""
+    scored, conceded = ("fthg", "ftag") if venue == "home" else ("ftag", "fthg")
+    last = matches.tail(5)
+    wins = (last[scored] > last[conceded]).sum()
+    draws = (last[scored] == last[conceded]).sum()
+    return wins, draws, last[scored].sum(), last[conceded].sum()
+
+
+def fixture_features(history, fixtures):
+    """Feature rows for unplayed fixtures, built like generate_enhanced_dataset_improved.py."""
+    rows = []
+    for home_team, away_team in fixtures:
+        home_games = history[history["home_team"] == home_team]
+        away_games = history[history["away_team"] == away_team]
+        home_elo, home_rank = _rating(history, home_team)
+        away_elo, away_rank = _rating(history, away_team)
+
+        hw, hd, hs, hc = _last5(home_games, "home")
+        aw, ad, as_, ac = _last5(away_games, "away")
+        momentum = (hs - hc) - (as_ - ac)
+        rows.append({
+            "elo_diff": home_elo - away_elo,
+            "form_diff": (hw + 0.5 * hd) - (aw + 0.5 * ad),
+            "goal_diff": hs - as_,
+            "rank_diff": away_rank - home_rank,
+            "momentum_diff": momentum,
+            "home_away_split_diff": 1,
+            "h2h_home_wins_last3": 0,
+            "h2h_away_wins_last3": 0,
+            "h2h_goal_diff_last3": 0,
+            "draw_rate_last5": (hd + ad) / 10.0,
+            "avg_goal_diff_last5": momentum / 5.0,
+            "days_since_last_match": 3,
+            "fixture_density_flag": 0,
+            "odds_diff": 0,
+            "implied_prob_home": 0
+        })
+    return pd.DataFrame(rows, columns=FEATURE_COLUMNS, dtype=float)
+
+
+def _rating(history, team):
+    """Elo and rank from the team's latest match in history."""
+    games = history[(history["home_team"] == team) | (history["away_team"] == team)]
+    if games.empty:
+        raise ValueError(f"No rating history for {team}")
+    row = games.iloc[-1]
+    if row["home_team"] == team:
+        return row["home_elo"], row["home_rank"]
+    return row["away_elo"], row["away_rank"]
+
+
+def _outcomes(goals):
+    """Model class (AWAY/DRAW/HOME) and both-teams-scored flag for each scoreline."""
+    outcome = np.sign(goals[:, 0] - goals[:, 1]) + 1
+    btts = (goals[:, 0] > 0) & (goals[:, 1] > 0)
+    return outcome, btts
+
+
+def scoreline_pools(league_df):
+    """Historical (home goals, away goals) scorelines for each result and BTTS flag, used to sample goals."""
+    goals = league_df[["fthg", "ftag"]].to_numpy(dtype=np.int16)
+    outcome, btts = _outcomes(goals)
+    pools = {}
+    for result in (AWAY, DRAW, HOME):
+        for both in (False, True):
+            pool = goals[(outcome == result) & (btts == both)]
+            # Fall back to every scoreline with that result if the league never produced this combination
+            pools[(result, both)] = pool if len(pool) else goals[outcome == result]
+    return pools
+
+
+def btts_given_outcome(probs, btts, league_df):
+    """P(both teams score | result) per fixture, consistent with the model's 1X2 and BTTS probabilities.
+
+    Starts from the league's historical BTTS rate for each result and shifts all
+    three by the same amount in log-odds, per fixture, until
+    sum(P(result) * P(BTTS | result)) equals the BTTS model's probability.
+    """
+    outcome, both = _outcomes(league_df[["fthg", "ftag"]].to_numpy())
+    base = np.array([both[outcome == r].mean() if (outcome == r).any() else both.mean() for r in (AWAY, DRAW, HOME)])
+    base_logit = np.log(np.clip(base, 1e-3, 1 - 1e-3) / (1 - np.clip(base, 1e-3, 1 - 1e-3)))
+    target = np.clip(btts, 1e-4, 1 - 1e-4)[:, None]
+
+    low = np.full((len(probs), 1), -20.0)
+    high = np.full((len(probs), 1), 20.0)
+    for _ in range(50):
+        mid = (low + high) / 2
+        implied = (probs / (1 + np.exp(-(base_logit + mid)))).sum(axis=1, keepdims=True)
+        too_high = implied > target
+        high = np.where(too_high, mid, high)
+        low = np.where(too_high, low, mid)
+    return 1 / (1 + np.exp(-(base_logit + (low + high) / 2)))
+
+
+def simulate_chunk(n_sims, probs, btts_cond, home_idx, away_idx, base_points, base_gd, base_gf, pools, seed):
+    """Simulate n_sims seasons at once.
+
+    Returns an (n_teams, n_teams) team-by-position count matrix and each team's
+    points summed over the simulations.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+    n_fixtures = len(home_idx)
+
+    # Pick each fixture's outcome from its cumulative 1X2 probabilities
+    cumulative = np.cumsum(probs, axis=1)
+    cumulative[:, -1] = 1.0
+    draws = rng.random((n_sims, n_fixtures))
+    outcome = (draws[:, :, None] > cumulative[None, :, :]).sum(axis=2)
+
+    # Decide whether both teams scored given each outcome, then sample a matching scoreline
+    both = rng.random((n_sims, n_fixtures)) < btts_cond[np.arange(n_fixtures), outcome]
+    home_goals = np.empty((n_sims, n_fixtures), dtype=np.int16)
+    away_goals = np.empty((n_sims, n_fixtures), dtype=np.int16)
+    for (result, scored), pool in pools.items():
+        mask = (outcome == result) & (both == scored)
+        picks = pool[rng.integers(0, len(pool), size=mask.sum())]
+        home_goals[mask] = picks[:, 0]
+        away_goals[mask] = picks[:, 1]
+
+    home_pts = np.select([outcome == HOME, outcome == DRAW], [3, 1], 0)
+    away_pts = np.select([outcome == AWAY, outcome == DRAW], [3, 1], 0)
+
+    # One-hot fixture -> team matrices turn per-fixture results into per-team totals with a matmul
+    home_onehot = np.zeros((n_fixtures, n_teams), dtype=np.int32)
+    away_onehot = np.zeros((n_fixtures, n_teams), dtype=np.int32)
+    home_onehot[np.arange(n_fixtures), home_idx] = 1
+    away_onehot[np.arange(n_fixtures), away_idx] = 1
+
+    points = base_points + home_pts @ home_onehot + away_pts @ away_onehot
+    gf = base_gf + home_goals.astype(np.int32) @ home_onehot + away_goals.astype(np.int32) @ away_onehot
+    ga = away_goals.astype(np.int32) @ home_onehot + home_goals.astype(np.int32) @ away_onehot
+    gd = base_gd + gf - base_gf - ga
+
+    # Rank by points, then goal difference, then goals scored, then a coin flip
+    order = np.lexsort((rng.random((n_sims, n_teams)), -gf, -gd, -points), axis=1)
+    positions = np.empty_like(order)
+    positions[np.arange(n_sims)[:, None], order] = np.arange(n_teams)
+
+    flat = np.arange(n_teams)[None, :] * n_teams + positions
+    return np.bincount(flat.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams), points.sum(axis=0)
+
+
+def get_pool(workers):
+    """Shared process pool, created once and rebuilt only if a different size is asked for.
+
+    Workers are spawned rather than forked because callers such as the API
+    already run background threads (request logger, micro-batcher).
+    """
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def simulate_season(league, season=None, n_sims=DEFAULT_SIMS, workers=1, seed=None, fixtures=None):
+    """Monte Carlo league table for one division.
+
+    Standings come from the historical dataset. Remaining fixtures come from
+    `fixtures`, else data/fixtures/{league}_{season}.csv, else the unplayed
+    pairings of the teams in the data; either way played plus remaining must
+    form a full double round-robin of the real league size, or ValueError is
+    raised. All fixtures are scored with one batched model call and seasons are
+    simulated in NumPy chunks, optionally spread over `workers` processes.
+    Results are cached per model version.
+    """
+    league = league.strip().upper()
+    if not 1 <= n_sims <= MAX_SIMS:
+        raise ValueError(f"Number of simulations must be between 1 and {MAX_SIMS}")
+
+    df = load_matches()
+    league_df = df[df["div"] == league]
+    if league_df.empty:
+        raise ValueError(f"No data for league {league}")
+    season = int(league_df["season"].max()) if season is None else int(season)
+    season_df = league_df[league_df["season"] == season]
+    label = f"{league} {season}-{str(season + 1)[-2:]}"
+    if season_df.empty:
+        raise ValueError(f"No data for {label}")
+    league_size, relegated = league_format(league, season)
+
+    if fixtures is None:
+        fixtures = load_fixtures(league, season)
+    if fixtures is None:
+        teams = sorted(set(season_df["home_team"]).union(season_df["away_team"]))
+        fixtures = remaining_fixtures(season_df, teams)
+    else:
+        fixtures = [(h, a) for h, a in fixtures]
+        teams = sorted(set(season_df["home_team"]).union(season_df["away_team"]).union(*fixtures))
+    validate_schedule(season_df, teams, fixtures, league_size, label)
+
+    version = model_version()
+    key = (league, season, n_sims, seed, tuple(fixtures), version)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    table = current_standings(season_df, teams)
+    model_main, model_btts = load_models()
+    n_teams = len(teams)
+    if fixtures:
+        # Only matches up to the last one played this season, so past seasons don't see later data
+        history = df[df["date"] <= season_df["date"].max()]
+        features = fixture_features(history, fixtures)
+        probs = model_main.predict_proba(features)
+        btts = model_btts.predict_proba(features)[:, 1]
+    else:
+        probs = np.empty((0, 3))
+        btts = np.empty(0)
+    btts_cond = btts_given_outcome(probs, btts, league_df)
+
+    index = {team: i for i, team in enumerate(teams)}
+    home_idx = np.array([index[h] for h, _ in fixtures], dtype=np.int64)
+    away_idx = np.array([index[a] for _, a in fixtures], dtype=np.int64)
+    base = (table["points"].to_numpy(), table["gd"].to_numpy(), table["gf"].to_numpy())
+    pools = scoreline_pools(league_df)
+
+    chunks = [CHUNK_SIZE] * (n_sims // CHUNK_SIZE) + ([n_sims % CHUNK_SIZE] if n_sims % CHUNK_SIZE else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    args = [(size, probs, btts_cond, home_idx, away_idx, *base, pools, s) for size, s in zip(chunks, seeds)]
+    if workers > 1:
+        results = list(get_pool(workers).map(simulate_chunk, *zip(*args)))
+    else:
+        results = [simulate_chunk(*a) for a in args]
+
+    counts = sum(r[0] for r in results)
+    total_points = sum(r[1] for r in results)
+    distribution = counts / n_sims
+
+    standings = []
+    for i, team in enumerate(teams):
+        dist = distribution[i]
+        standings.append({
+            "team": team,
+            "played": int(table.loc[team, "p"]),
+            "points": int(table.loc[team, "points"]),
+            "goal_difference": int(table.loc[team, "gd"]),
+            "expected_points": round(float(total_points[i]) / n_sims, 2),
+            "average_position": round(float((dist * np.arange(1, n_teams + 1)).sum()), 2),
+            "title": round(float(dist[0]) * 100, 2),
+            f"top_{TOP_N}": round(float(dist[:TOP_N].sum()) * 100, 2),
+            "relegation": round(float(dist[-relegated:].sum()) * 100, 2),
+            "positions": [round(float(p) * 100, 3) for p in dist],
+        })
+    standings.sort(key=lambda s: s["average_position"])
+
+    result = {
+        "league": league,
+        "season": f"{season}-{str(season + 1)[-2:]}",
+        "simulations": n_sims,
+        "relegation_spots": relegated,
+        "model_version": version,
+        "remaining_fixtures": [
+            {
+                "home_team": h,
+                "away_team": a,
+                "home_win": round(float(p[HOME]) * 100, 2),
+                "draw": round(float(p[DRAW]) * 100, 2),
+                "away_win": round(float(p[AWAY]) * 100, 2),
+                "btts": round(float(b) * 100, 2),
+            }
+            for (h, a), p, b in zip(fixtures, probs, btts)
+        ],
+        "standings": standings,
+    }
+    with _lock:
+        # Results from an older model are never served again
+        for stale in [k for k in _cache if k[-1] != version]:
+            del _cache[stale]
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the rest of a season from model probabilities")
+    parser.add_argument("league", help="Division code, e.g. E0, SP1, I1, D1, F1")
+    parser.add_argument("--season", type=int, default=None, help="Season start year (default: latest)")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS, help="Number of simulated seasons")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes to spread simulations over")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--fixtures", default=None, help="CSV of remaining fixtures with home_team, away_team columns")
+    args = parser.parse_args()
+
+    fixtures = read_fixtures(args.fixtures) if args.fixtures else None
+    try:
+        result = simulate_season(args.league, args.season, args.sims, args.workers, args.seed, fixtures)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"📊 {result['league']} {result['season']}: {len(result['remaining_fixtures'])} fixtures left, "
+          f"{result['simulations']} simulations")
+    print(f"{'Team':<22}{'Pts':>5}{'xPts':>8}{'AvgPos':>8}{'Title%':>8}{'Top4%':>8}{'Rel%':>8}")
+    for s in result["standings"]:
+        print(f"{s['team']:<22}{s['points']:>5}{s['expected_points']:>8.1f}{s['average_position']:>8.2f}"
+              f"{s['title']:>8.2f}{s[f'top_{TOP_N}']:>8.2f}{s['relegation']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from micro_batcher import MicroBatcher
+
+
+def fitted_model():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(1, 10, size=(300, 3))
+    y = np.argmin(X, axis=1)
+    return LogisticRegression(max_iter=500).fit(X, y), rng.uniform(1, 10, size=(64, 3))
+
+
+def test_concurrent_callers_get_their_own_rows():
+    model, X = fitted_model()
+    batcher = MicroBatcher(model.predict_proba, max_batch_size=16, max_wait_ms=5)
+    results = [None] * len(X)
+
+    def call(i):
+        results[i] = batcher.predict(X[i], timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(X))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    np.testing.assert_allclose(np.vstack(results), model.predict_proba(X))
+    assert batcher.metrics()["batches"] < len(X)
+
+
+def test_exception_reaches_every_caller_in_the_batch():
+    def fail(X):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(fail, max_batch_size=10, max_wait_ms=200)
+    futures = [batcher.submit([i, i, i]) for i in range(10)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model exploded"):
+            future.result(timeout=5)
+    assert batcher.metrics()["batches"] == 1
+
+
+def test_wrong_row_count_fails_the_whole_batch():
+    batcher = MicroBatcher(lambda X: X[:-1], max_batch_size=5, max_wait_ms=200)
+    futures = [batcher.submit([i, i, i]) for i in range(5)]
+
+    for future in futures:
+        with pytest.raises(ValueError, match="returned 4 rows for a batch of 5"):
+            future.result(timeout=5)
+
+
+def test_worker_survives_a_failed_batch():
+    calls = []
+
+    def flaky(X):
+        calls.append(len(X))
+        if len(calls) == 1:
+            raise RuntimeError("first batch fails")
+        return X * 2
+
+    batcher = MicroBatcher(flaky, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.predict([1, 2, 3], timeout=5)
+    np.testing.assert_array_equal(batcher.predict([1, 2, 3], timeout=5), [2, 4, 6])
+
+
+def test_max_batch_size_caps_each_batch():
+    sizes = []
+
+    def record(X):
+        sizes.append(len(X))
+        return X
+
+    batcher = MicroBatcher(record, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit([i, i, i]) for i in range(50)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert sum(sizes) == 50
+    assert max(sizes) == 8
+    assert batcher.metrics()["largest_batch"] == 8
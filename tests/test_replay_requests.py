@@ -0,0 +1,49 @@
+import json
+import time
+
+import replay_requests
+
+
+def write_records(path, records, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+
+def api_record(i):
+    return {"source": "api", "endpoint": "/predict", "request": {"i": i}, "response": {}}
+
+
+def test_read_records_ignores_lines_appended_during_replay(tmp_path):
+    path = tmp_path / "requests-api.jsonl"
+    write_records(path, [api_record(i) for i in range(3)] + [{"source": "bot", "endpoint": "predict", "request": {}}])
+
+    records = replay_requests.read_records(str(path))
+    first = next(records)
+    # The server being replayed against keeps appending to the same file
+    write_records(path, [api_record(i) for i in range(3, 10)], mode="a")
+
+    assert [first["request"]["i"]] + [r["request"]["i"] for r in records] == [0, 1, 2]
+
+
+def test_rate_limited_latency_includes_queueing(tmp_path, monkeypatch):
+    path = tmp_path / "requests-api.jsonl"
+    write_records(path, [api_record(i) for i in range(10)])
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {}
+
+    class SlowSession:
+        def post(self, *args, **kwargs):
+            time.sleep(0.05)
+            return Response()
+
+    monkeypatch.setattr(replay_requests.requests, "Session", SlowSession)
+    latencies, errors, _ = replay_requests.replay(str(path), "http://test", concurrency=1, rate=100)
+
+    assert errors == 0 and len(latencies) == 10
+    # Requests are due every 10 ms but the server takes 50 ms each, so the backlog must show up
+    assert max(latencies) > 300
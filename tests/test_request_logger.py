@@ -0,0 +1,71 @@
+import gzip
+import json
+import os
+import re
+import threading
+
+import pytest
+
+from request_logger import RequestLogger
+
+
+def read_log_dir(directory):
+    records = []
+    for name in os.listdir(directory):
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_rotation_keeps_every_record(tmp_path, compress):
+    # A tiny max_bytes forces many rotations inside the same millisecond
+    logger = RequestLogger(str(tmp_path / "r.jsonl"), max_bytes=500, compress=compress,
+                           batch_size=5, flush_interval=0.01)
+    for i in range(300):
+        logger.log({"i": i})
+    logger.close()
+
+    assert sorted(r["i"] for r in read_log_dir(tmp_path)) == list(range(300))
+    rotated = [n for n in os.listdir(tmp_path) if n != "r.jsonl"]
+    assert len(rotated) > 1
+    suffix = r"\.jsonl\.gz" if compress else r"\.jsonl"
+    for name in rotated:
+        assert re.fullmatch(r"r-\d{8}-\d{6}-\d{3}-\d+" + suffix, name), name
+
+
+def test_compressed_rotation_leaves_only_gzip_files(tmp_path):
+    logger = RequestLogger(str(tmp_path / "r.jsonl"), max_bytes=200, compress=True,
+                           batch_size=5, flush_interval=0.01)
+    for i in range(50):
+        logger.log({"i": i})
+    logger.close()
+
+    rotated = [n for n in os.listdir(tmp_path) if n != "r.jsonl"]
+    assert rotated and all(n.endswith(".jsonl.gz") for n in rotated)
+    with gzip.open(tmp_path / rotated[0], "rt", encoding="utf-8") as f:
+        assert all("i" in json.loads(line) for line in f)
+
+
+def test_dropped_records_are_counted(tmp_path):
+    logger = RequestLogger(str(tmp_path / "r.jsonl"), queue_size=2, flush_interval=0.01)
+    release = threading.Event()
+    write = logger._write
+
+    def blocked_write(batch):
+        release.wait()
+        write(batch)
+
+    logger._write = blocked_write
+    logger.log({"i": 0})
+    # Wait until the writer has taken the first record and is stuck writing it
+    while logger.stats()["queued"]:
+        pass
+    for i in range(1, 11):
+        logger.log({"i": i})
+
+    assert logger.stats()["dropped"] == 8
+    release.set()
+    logger.close()
+    assert len(read_log_dir(tmp_path)) == 3
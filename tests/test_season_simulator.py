@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import season_simulator
+
+TEAMS = [f"Club {c}" for c in "ABCDEFGH"]
+LEAGUE = "T1"
+SIZE, RELEGATED = len(TEAMS), 2
+
+
+def synthetic_matches(removed=10):
+    """A complete 8-team double round-robin in 2023-24 with its last `removed` matches not yet played."""
+    rng = np.random.default_rng(7)
+    elo = {team: 1900 - 40 * i for i, team in enumerate(TEAMS)}
+    pairs = [(h, a) for h in TEAMS for a in TEAMS if h != a]
+    rng.shuffle(pairs)
+    dates = pd.date_range("2023-08-12", "2024-05-18", periods=len(pairs))
+    rows = []
+    for date, (home, away) in list(zip(dates, pairs))[:len(pairs) - removed]:
+        hg, ag = rng.poisson(1.5), rng.poisson(1.1)
+        rows.append({
+            "div": LEAGUE, "date": date, "home_team": home, "away_team": away,
+            "fthg": hg, "ftag": ag, "result": int(np.sign(hg - ag)),
+            "home_elo": elo[home], "home_rank": TEAMS.index(home) + 1,
+            "away_elo": elo[away], "away_rank": TEAMS.index(away) + 1,
+        })
+    df = pd.DataFrame(rows)
+    return df.assign(season=season_simulator.assign_seasons(df)).sort_values("date")
+
+
+@pytest.fixture
+def league(monkeypatch):
+    df = synthetic_matches()
+    monkeypatch.setattr(season_simulator, "load_matches", lambda: df)
+    monkeypatch.setitem(season_simulator.LEAGUE_FORMATS, LEAGUE, (SIZE, RELEGATED))
+    season_simulator._cache.clear()
+    yield df
+    season_simulator._cache.clear()
+
+
+def test_distributions_are_consistent(league):
+    result = season_simulator.simulate_season(LEAGUE, n_sims=20_000, seed=1)
+
+    assert result["season"] == "2023-24"
+    assert len(result["remaining_fixtures"]) == 10
+    standings = result["standings"]
+    assert len(standings) == SIZE
+    for team in standings:
+        assert sum(team["positions"]) == pytest.approx(100, abs=0.01)
+        assert team["expected_points"] >= team["points"]
+    assert sum(t["title"] for t in standings) == pytest.approx(100, abs=0.05)
+    assert sum(t[f"top_{season_simulator.TOP_N}"] for t in standings) == pytest.approx(
+        100 * season_simulator.TOP_N, abs=0.05)
+    assert sum(t["relegation"] for t in standings) == pytest.approx(100 * RELEGATED, abs=0.05)
+
+
+def test_fixed_seed_is_reproducible(league):
+    first = season_simulator.simulate_season(LEAGUE, n_sims=15_000, seed=3)
+    season_simulator._cache.clear()
+    second = season_simulator.simulate_season(LEAGUE, n_sims=15_000, seed=3)
+    assert first is not second
+    assert first["standings"] == second["standings"]
+
+
+def test_worker_processes_match_single_process(league):
+    single = season_simulator.simulate_season(LEAGUE, n_sims=25_000, seed=5, workers=1)
+    season_simulator._cache.clear()
+    spread = season_simulator.simulate_season(LEAGUE, n_sims=25_000, seed=5, workers=2)
+    assert single["standings"] == spread["standings"]
+
+
+def test_league_code_is_normalized(league):
+    result = season_simulator.simulate_season(" t1 ", n_sims=1_000, seed=1)
+    assert result["league"] == LEAGUE
+
+
+@pytest.mark.parametrize("n_sims", [0, -5, season_simulator.MAX_SIMS + 1])
+def test_rejects_out_of_range_simulation_counts(league, n_sims):
+    with pytest.raises(ValueError, match="Number of simulations"):
+        season_simulator.simulate_season(LEAGUE, n_sims=n_sims)
+
+
+def schedule_parts(df):
+    teams = sorted(TEAMS)
+    return df, teams, season_simulator.remaining_fixtures(df, teams)
+
+
+def test_validate_schedule_accepts_complete_round_robin():
+    df, teams, fixtures = schedule_parts(synthetic_matches())
+    season_simulator.validate_schedule(df, teams, fixtures, SIZE, "T1")
+
+
+def test_validate_schedule_rejects_repeated_fixture():
+    df, teams, fixtures = schedule_parts(synthetic_matches())
+    played = (df.iloc[0]["home_team"], df.iloc[0]["away_team"])
+    with pytest.raises(ValueError, match="more than once"):
+        season_simulator.validate_schedule(df, teams, fixtures + [played], SIZE, "T1")
+
+
+def test_validate_schedule_rejects_missing_fixture():
+    df, teams, fixtures = schedule_parts(synthetic_matches())
+    with pytest.raises(ValueError, match="every team needs 14 fixtures"):
+        season_simulator.validate_schedule(df, teams, fixtures[1:], SIZE, "T1")
+
+
+def test_validate_schedule_rejects_wrong_team_count():
+    df, teams, fixtures = schedule_parts(synthetic_matches())
+    with pytest.raises(ValueError, match="has 8 teams in the data but the league has 10"):
+        season_simulator.validate_schedule(df, teams, fixtures, 10, "T1")